@@ -1,5 +1,6 @@
 import re
 from collections import deque
+from tac_program import TACProgram
 
 class CodeGenerator:
     def __init__(self):
@@ -240,51 +241,53 @@ class CodeGenerator:
         
         return output
     
-    def generate_three_address_code(self, expression):
-        """Generate three-address code from expression"""
-        try:
-            # Validate expression
-            is_valid, error = self.validate_expression(expression)
-            if not is_valid:
-                return [f"Error: {error}"]
-                
-            # Tokenize
-            tokens = self.tokenize(expression)
-            
-            # Convert to postfix
-            postfix = self.shunting_yard(tokens)
+    def generate_three_address_program(self, expression):
+        """Generate three-address code as a columnar TACProgram"""
+        # Validate expression
+        is_valid, error = self.validate_expression(expression)
+        if not is_valid:
+            raise ValueError(error)
             
-            # Generate three-address code
-            stack = []
-            code = []
-            temp_count = 0
-            
-            for token in postfix:
-                if token.isnumeric():
-                    stack.append(token)
-                elif token in self.operators:
-                    if len(stack) < 2:
-                        return [f"Error: Not enough operands for operator {token}"]
-                        
-                    op2 = stack.pop()
-                    op1 = stack.pop()
-                    
-                    # Create temporary variable
-                    temp = f't{temp_count}'
-                    temp_count += 1
-                    
-                    # Generate code line
-                    code.append(f"{temp} = {op1} {self.operators[token]} {op2}")
+        # Tokenize
+        tokens = self.tokenize(expression)
+        
+        # Convert to postfix
+        postfix = self.shunting_yard(tokens)
+        
+        # Generate three-address code
+        stack = []
+        program = TACProgram()
+        
+        for token in postfix:
+            if token.isnumeric():
+                stack.append(program.symbol(token))
+            elif token in self.operators:
+                if len(stack) < 2:
+                    raise ValueError(f"Not enough operands for operator {token}")
                     
-                    # Push result back to stack
-                    stack.append(temp)
-                else:
-                    stack.append(token)
-            
-            if len(stack) != 1:
-                return ["Error: Invalid expression - multiple values left in stack"]
+                op2 = stack.pop()
+                op1 = stack.pop()
+                
+                # Create temporary variable
+                temp = program.temp()
                 
-            return code
+                # Generate code line
+                program.append(self.operators[token], temp, op1, op2)
+                
+                # Push result back to stack
+                stack.append(temp)
+            else:
+                stack.append(program.symbol(token))
+        
+        if len(stack) != 1:
+            raise ValueError("Invalid expression - multiple values left in stack")
+            
+        return program
+    
+    def generate_three_address_code(self, expression):
+        """Generate three-address code from expression"""
+        try:
+            return list(self.generate_three_address_program(expression))
             
         except Exception as e:
             return [f"Error: {str(e)}"]
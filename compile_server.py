@@ -0,0 +1,353 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from code_generator import CodeGenerator
+
+# Compile modes and the CodeGenerator method that serves each of them
+MODES = {
+    'tac': 'generate_three_address_code',
+    'postfix': 'generate_postfix_notation',
+    'steps': 'generate_translation_steps',
+}
+
+# Per-process generator, created lazily inside each pool worker
+_generator = None
+
+
+def _compile_batch(jobs):
+    """Compile a batch of (mode, expression) pairs inside a pool worker"""
+    global _generator
+    if _generator is None:
+        _generator = CodeGenerator()
+    return [getattr(_generator, MODES[mode])(expression) for mode, expression in jobs]
+
+
+def _request_id(line):
+    """Return the id of a raw request line, or None if it has none"""
+    try:
+        request = json.loads(line)
+    except (TypeError, ValueError, RecursionError):
+        return None
+    return request.get('id') if isinstance(request, dict) else None
+
+
+class CompileServer:
+    def __init__(self, workers=None, queue_size=1024, batch_size=64,
+                 max_pending_per_client=256, line_limit=64 * 1024,
+                 latency_window=10000):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.max_pending_per_client = max_pending_per_client
+        self.line_limit = line_limit
+
+        # Jobs waiting for a pool worker; bounded so that producers block
+        self.queue = None
+        # (mode, expression) -> future shared by all identical in-flight requests
+        self.in_flight = {}
+        # Enqueue tasks that outlive the caller that started them
+        self.enqueuing = set()
+
+        self.executor = None
+        self.dispatchers = []
+        self.server = None
+        self.closing = False
+        # Writer of every connected client -> (handler task, request tasks)
+        self.clients = {}
+
+        # Metrics
+        self.requests = 0
+        self.compiles = 0
+        self.coalesced = 0
+        # Malformed requests and compiles that returned an error
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=latency_window)
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """Start the pool, the dispatchers and the listening socket"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.closing = False
+
+        # One dispatcher per pool worker keeps every process busy
+        # without submitting more work than the pool can run
+        self.dispatchers = [asyncio.create_task(self._dispatch())
+                            for _ in range(self.workers)]
+
+        if path:
+            self.server = await asyncio.start_unix_server(
+                self._handle_client, path=path, limit=self.line_limit)
+        else:
+            self.server = await asyncio.start_server(
+                self._handle_client, host, port, limit=self.line_limit)
+        return self.server
+
+    async def stop(self):
+        """Stop accepting clients, drop unanswered requests and shut down the pool"""
+        self.closing = True
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        # Closing the transports ends each handler's read loop, and
+        # cancelling its requests ends any wait for a compile
+        handlers = []
+        for writer, (handler, tasks) in list(self.clients.items()):
+            writer.close()
+            for task in list(tasks):
+                task.cancel()
+            handlers.append(handler)
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+        for task in self.dispatchers + list(self.enqueuing):
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, *self.enqueuing, return_exceptions=True)
+        self.dispatchers = []
+        if self.executor is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, partial(self.executor.shutdown, cancel_futures=True))
+            self.executor = None
+
+    async def compile(self, mode, expression):
+        """Compile an expression, sharing the result with identical requests"""
+        if mode not in MODES:
+            return [f"Error: Unknown mode '{mode}'"]
+
+        key = (mode, expression)
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+
+        # The put runs in its own task so that other clients waiting on
+        # this key still get a result if the first caller is cancelled
+        # while the queue is full
+        enqueue = asyncio.create_task(self._enqueue(key, future))
+        self.enqueuing.add(enqueue)
+        enqueue.add_done_callback(self.enqueuing.discard)
+        await asyncio.shield(enqueue)
+        return await asyncio.shield(future)
+
+    async def _enqueue(self, key, future):
+        await self.queue.put((key, future))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    async def _dispatch(self):
+        """Drain the queue in batches and run each batch in the process pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            executor = self.executor
+            try:
+                results = await loop.run_in_executor(
+                    executor, _compile_batch, [key for key, _ in batch])
+                self.compiles += len(batch)
+            except Exception as e:
+                results = [[f"Error: {str(e)}"]] * len(batch)
+                # A dead worker breaks the whole pool, so start a new one
+                # unless another dispatcher has already done so
+                if isinstance(e, BrokenProcessPool) and self.executor is executor:
+                    executor.shutdown(wait=False)
+                    self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+            for (key, future), result in zip(batch, results):
+                self.in_flight.pop(key, None)
+                if not future.done():
+                    future.set_result(result)
+
+    def metrics(self):
+        """Return a snapshot of throughput, queue and latency metrics"""
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            'requests': self.requests,
+            'compiles': self.compiles,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'in_flight': len(self.in_flight),
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'max_queue_depth': self.max_queue_depth,
+            'latency_ms': {
+                'p50': percentile(0.50) * 1000,
+                'p99': percentile(0.99) * 1000,
+                'max': (latencies[-1] if latencies else 0.0) * 1000,
+            },
+        }
+
+    async def _handle_client(self, reader, writer):
+        """Serve newline-delimited JSON requests from a single client"""
+        # Caps how many unanswered requests one client may have, so a
+        # fast sender stops being read instead of growing memory
+        pending = asyncio.Semaphore(self.max_pending_per_client)
+        tasks = set()
+        self.clients[writer] = (asyncio.current_task(), tasks)
+
+        try:
+            while not self.closing:
+                line = await self._read_line(reader)
+                if line == b'':
+                    break
+                if line is not None and not line.strip():
+                    continue
+                await pending.acquire()
+                if self.closing:
+                    pending.release()
+                    break
+                task = asyncio.create_task(self._handle_request(line, writer, pending))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.clients.pop(writer, None)
+            writer.close()
+
+    async def _read_line(self, reader):
+        """Read one request line, or return None if it is longer than the limit"""
+        try:
+            return await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError:
+            pass
+
+        # Discard the rest of the oversized line so the next one parses
+        while True:
+            try:
+                await reader.readuntil(b'\n')
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as e:
+                await reader.readexactly(e.consumed)
+
+    async def _handle_request(self, line, writer, pending):
+        start = time.perf_counter()
+        try:
+            try:
+                response = await self._respond(line)
+            except Exception as e:
+                # Every request line gets exactly one reply, so a failure
+                # here must not leave the client waiting
+                self.errors += 1
+                response = {'id': _request_id(line), 'error': f"Internal error: {str(e)}"}
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+        finally:
+            pending.release()
+            self.latencies.append(time.perf_counter() - start)
+
+    async def _respond(self, line):
+        """Build the response for one raw request line"""
+        self.requests += 1
+        if line is None:
+            self.errors += 1
+            return {'error': 'Request too long'}
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+        except (ValueError, RecursionError) as e:
+            self.errors += 1
+            return {'error': f"Invalid request: {str(e)}"}
+
+        response = {'id': request.get('id')}
+        if request.get('op') == 'metrics':
+            response['metrics'] = self.metrics()
+            return response
+
+        expression = request.get('expression')
+        if not isinstance(expression, str):
+            self.errors += 1
+            response['error'] = "Missing 'expression'"
+            return response
+
+        mode = request.get('mode', 'tac')
+        if not isinstance(mode, str):
+            self.errors += 1
+            response['error'] = "Invalid 'mode'"
+            return response
+
+        result = await self.compile(mode, expression)
+        if result and result[0].startswith('Error:'):
+            self.errors += 1
+        response['result'] = result
+        return response
+
+
+async def request(payloads, host='127.0.0.1', port=8765, path=None):
+    """Send requests to a running server and return the responses in order"""
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i, payload in enumerate(payloads):
+            payload = dict(payload, id=i)
+            writer.write(json.dumps(payload).encode() + b'\n')
+        await writer.drain()
+
+        responses = [None] * len(payloads)
+        for _ in payloads:
+            response = json.loads(await reader.readline())
+            responses[response['id']] = response
+        return responses
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def serve(args):
+    server = CompileServer(workers=args.workers, queue_size=args.queue_size,
+                           batch_size=args.batch_size, line_limit=args.line_limit)
+    await server.start(args.host, args.port, args.unix)
+    where = args.unix or f'{args.host}:{args.port}'
+    print(f'Compile server listening on {where}')
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve CodeGenerator over a local socket')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Listen on a Unix socket path instead of TCP')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--queue-size', type=int, default=1024)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--line-limit', type=int, default=64 * 1024,
+                        help='Longest request line accepted, in bytes')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
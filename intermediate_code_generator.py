@@ -254,8 +254,8 @@ class IntermediateCodeGenerator(QMainWindow):
             self.step_history.append(f"\nStep 4: Postfix Notation\n-----------------------\nPostfix: {' '.join(postfix)}\n")
             
             # Step 5: Three-Address Code Generation
-            tac = self.code_generator.generate_three_address_code(expression)
-            self.step_history.append(f"\nStep 5: Three-Address Code\n-------------------------\nCode:\n{'\n'.join(tac)}")
+            tac = '\n'.join(self.code_generator.generate_three_address_code(expression))
+            self.step_history.append(f"\nStep 5: Three-Address Code\n-------------------------\nCode:\n{tac}")
             
             # Show all steps
             self.steps_text.setText('\n'.join(self.step_history))
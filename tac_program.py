@@ -0,0 +1,98 @@
+from array import array
+
+# Mnemonics that can appear in three-address code, indexed by opcode number
+OPCODES = ('ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'POW',
+           'LT', 'LE', 'GT', 'GE', 'EQ', 'NE',
+           'AND', 'OR', 'NOT')
+
+OPCODE_INDEX = {mnemonic: i for i, mnemonic in enumerate(OPCODES)}
+
+# Operand slot value for an instruction that has no second source
+NO_OPERAND = -1
+
+
+class TACProgram:
+    """Three-address code stored as parallel columns of integers.
+
+    Each instruction ``dest = src1 OP src2`` is one entry in the opcode,
+    dest, src1 and src2 arrays. An operand is either a non-negative index
+    into the interned symbol table (variables and literals) or a negative
+    number encoding temporary ``t<k>`` as ``-(k + 2)``, so temporaries
+    cost no string at all. Lines are only turned into text when read.
+    """
+
+    def __init__(self):
+        self.opcode = array('B')
+        self.dest = array('i')
+        self.src1 = array('i')
+        self.src2 = array('i')
+
+        # Interned names and literals, and their reverse lookup
+        self.symbols = []
+        self.symbol_index = {}
+        self.temp_count = 0
+
+    def symbol(self, name):
+        """Return the operand for a variable or literal, interning it if needed"""
+        index = self.symbol_index.get(name)
+        if index is None:
+            index = len(self.symbols)
+            self.symbols.append(name)
+            self.symbol_index[name] = index
+        return index
+
+    def temp(self):
+        """Allocate the next temporary and return its operand"""
+        operand = -(self.temp_count + 2)
+        self.temp_count += 1
+        return operand
+
+    def name(self, operand):
+        """Return the display name of an operand"""
+        if operand >= 0:
+            return self.symbols[operand]
+        if operand == NO_OPERAND:
+            return None
+        return f't{-operand - 2}'
+
+    def append(self, mnemonic, dest, src1, src2=NO_OPERAND):
+        """Add the instruction ``dest = src1 mnemonic src2`` from operands"""
+        self.opcode.append(OPCODE_INDEX[mnemonic])
+        self.dest.append(dest)
+        self.src1.append(src1)
+        self.src2.append(src2)
+
+    def instruction(self, i):
+        """Return instruction ``i`` as (dest, mnemonic, src1, src2) names"""
+        return (self.name(self.dest[i]), OPCODES[self.opcode[i]],
+                self.name(self.src1[i]), self.name(self.src2[i]))
+
+    def render(self, i):
+        """Format instruction ``i`` the way the GUI displays it"""
+        dest, mnemonic, src1, src2 = self.instruction(i)
+        if src2 is None:
+            return f"{dest} = {mnemonic} {src1}"
+        return f"{dest} = {src1} {mnemonic} {src2}"
+
+    def columns(self):
+        """Return read-only memoryviews over the opcode and operand columns"""
+        return {
+            'opcode': memoryview(self.opcode).toreadonly(),
+            'dest': memoryview(self.dest).toreadonly(),
+            'src1': memoryview(self.src1).toreadonly(),
+            'src2': memoryview(self.src2).toreadonly(),
+        }
+
+    def __len__(self):
+        return len(self.opcode)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("instruction index out of range")
+        return self.render(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.render(i)
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+import unittest
+
+from compile_server import CompileServer, request
+
+
+class CompileServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = CompileServer(workers=2, line_limit=1024)
+        await self.server.start(port=0)
+        self.port = self.server.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_compiles_each_mode(self):
+        responses = await request([
+            {'expression': 'a + b * c'},
+            {'expression': '3 + 4', 'mode': 'postfix'},
+            {'expression': 'a + b', 'mode': 'steps'},
+        ], port=self.port)
+        self.assertEqual(responses[0], {'id': 0, 'result': ['t0 = b MUL c', 't1 = a ADD t0']})
+        self.assertEqual(responses[1]['result'], ['3', '4', '+'])
+        self.assertEqual(responses[2]['result'][0], 'Step 1: Input Expression')
+
+    async def test_error_responses(self):
+        responses = await asyncio.wait_for(request([
+            {'expression': 'a', 'mode': 'bad'},
+            {'expression': '(a'},
+            {'mode': 'tac'},
+            {'expression': 'a', 'mode': ['x']},
+        ], port=self.port), 5)
+        self.assertEqual(responses[0]['result'], ["Error: Unknown mode 'bad'"])
+        self.assertEqual(responses[1]['result'], ['Error: Unbalanced parentheses'])
+        self.assertEqual(responses[2]['error'], "Missing 'expression'")
+        self.assertEqual(responses[3], {'id': 3, 'error': "Invalid 'mode'"})
+        self.assertEqual(self.server.errors, 4)
+
+    async def test_invalid_json(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(b'not json\n[1]\n')
+        first = json.loads(await reader.readline())
+        second = json.loads(await reader.readline())
+        writer.close()
+        await writer.wait_closed()
+        self.assertTrue(first['error'].startswith('Invalid request'))
+        self.assertIn('JSON object', second['error'])
+
+    async def test_deeply_nested_json(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(b'[' * 1020 + b'\n')
+        writer.write(json.dumps({'id': 2, 'expression': 'a + b'}).encode() + b'\n')
+        first = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        second = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        writer.close()
+        await writer.wait_closed()
+        self.assertTrue(first['error'].startswith('Invalid request'))
+        self.assertEqual(second, {'id': 2, 'result': ['t0 = a ADD b']})
+        self.assertEqual(self.server.errors, 1)
+
+    async def test_unexpected_failure_still_replies(self):
+        async def broken_compile(mode, expression):
+            raise RuntimeError('boom')
+        self.server.compile = broken_compile
+
+        responses = await asyncio.wait_for(
+            request([{'expression': 'a + b'}], port=self.port), 5)
+        self.assertEqual(responses, [{'id': 0, 'error': 'Internal error: boom'}])
+        self.assertEqual(self.server.errors, 1)
+
+    async def test_line_too_long(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        long_expression = '+'.join(['a'] * 2000)
+        writer.write(json.dumps({'id': 1, 'expression': long_expression}).encode() + b'\n')
+        writer.write(json.dumps({'id': 2, 'expression': 'a + b'}).encode() + b'\n')
+        first = json.loads(await reader.readline())
+        second = json.loads(await reader.readline())
+        writer.close()
+        await writer.wait_closed()
+        self.assertEqual(first, {'error': 'Request too long'})
+        self.assertEqual(second, {'id': 2, 'result': ['t0 = a ADD b']})
+
+    async def test_coalesces_identical_requests(self):
+        results = await asyncio.gather(*(self.server.compile('tac', 'x * y') for _ in range(10)))
+        self.assertEqual(results, [['t0 = x MUL y']] * 10)
+        self.assertEqual(self.server.coalesced, 9)
+        self.assertEqual(self.server.compiles, 1)
+
+    async def test_metrics(self):
+        await request([{'expression': 'a + b'}], port=self.port)
+        metrics = (await request([{'op': 'metrics'}], port=self.port))[0]['metrics']
+        self.assertEqual(set(metrics), {'requests', 'compiles', 'coalesced', 'errors',
+                                        'in_flight', 'queue_depth', 'max_queue_depth',
+                                        'latency_ms'})
+        self.assertEqual(set(metrics['latency_ms']), {'p50', 'p99', 'max'})
+        self.assertEqual(metrics['requests'], 2)
+        self.assertEqual(metrics['compiles'], 1)
+        self.assertGreater(metrics['latency_ms']['max'], 0)
+
+    async def test_per_client_backpressure(self):
+        # With no dispatchers nothing completes, so the handler must stop
+        # reading once the client has max_pending_per_client requests open
+        for task in self.server.dispatchers:
+            task.cancel()
+        self.server.max_pending_per_client = 2
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        for i in range(5):
+            writer.write(json.dumps({'id': i, 'expression': f'a + {i}'}).encode() + b'\n')
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.server.requests, 2)
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_recovers_from_broken_pool(self):
+        with self.assertRaises(Exception):
+            await asyncio.wrap_future(self.server.executor.submit(os._exit, 1))
+        first = await self.server.compile('tac', 'a + b')
+        second = await self.server.compile('tac', 'a + b')
+        self.assertTrue(first[0].startswith('Error:'))
+        self.assertEqual(second, ['t0 = a ADD b'])
+        self.assertEqual(self.server.compiles, 1)
+
+    async def test_stop_with_connected_client(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        await self.server.stop()
+        self.assertEqual(await reader.read(), b'')
+        self.assertIsNone(self.server.executor)
+        writer.close()
+        with self.assertRaises(OSError):
+            await asyncio.open_connection('127.0.0.1', self.port)
+
+
+class CompileQueueTest(unittest.IsolatedAsyncioTestCase):
+    """Queue behaviour, checked without a process pool or a socket"""
+
+    async def asyncSetUp(self):
+        self.server = CompileServer(queue_size=1)
+        self.server.queue = asyncio.Queue(maxsize=1)
+        await self.server.queue.put(('filler', None))
+
+    async def test_full_queue_blocks_callers(self):
+        caller = asyncio.create_task(self.server.compile('tac', 'a + b'))
+        await asyncio.sleep(0.01)
+        self.assertFalse(caller.done())
+        self.assertEqual(self.server.metrics()['queue_depth'], 1)
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        for task in self.server.enqueuing:
+            task.cancel()
+
+    async def test_cancelled_first_caller_does_not_cancel_waiters(self):
+        first = asyncio.create_task(self.server.compile('tac', 'a + b'))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(self.server.compile('tac', 'a + b'))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        # Free the queue and answer the job the way a dispatcher would
+        await self.server.queue.get()
+        key, future = await asyncio.wait_for(self.server.queue.get(), 1)
+        self.assertEqual(key, ('tac', 'a + b'))
+        future.set_result(['t0 = a ADD b'])
+        self.assertEqual(await asyncio.wait_for(second, 1), ['t0 = a ADD b'])
+        self.assertEqual(self.server.coalesced, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
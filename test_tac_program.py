@@ -0,0 +1,85 @@
+import unittest
+
+from code_generator import CodeGenerator
+from tac_program import NO_OPERAND, OPCODES, TACProgram
+
+# Output of the string-based generator this container replaced
+EXPECTED_CODE = {
+    'a + b * c': ['t0 = b MUL c', 't1 = a ADD t0'],
+    '3 + 4 * 2 / (1 - 5) ** 2': ['t0 = 4 MUL 2', 't1 = 1 SUB 5', 't2 = t1 POW 2', 't3 = t0 DIV t2', 't4 = 3 ADD t3'],
+    'x < y && 2': ['t0 = x LT y', 't1 = t0 AND 2'],
+    'a - b - c': ['t0 = a SUB b', 't1 = t0 SUB c'],
+    'a ** b ** c': ['t0 = b POW c', 't1 = a POW t0'],
+    '(a + b) * (c + d)': ['t0 = a ADD b', 't1 = c ADD d', 't2 = t0 MUL t1'],
+    'a // b % c': ['t0 = a DIV b', 't1 = t0 MOD c'],
+    'x != y || z >= 1': ['t0 = x NE y', 't1 = z GE 1', 't2 = t0 OR t1'],
+    't0 + a * b': ['t0 = a MUL b', 't1 = t0 ADD t0'],
+    '': ['Error: Expression cannot be empty'],
+    'a b': ['Error: Invalid expression - multiple values left in stack'],
+    '(a': ['Error: Unbalanced parentheses'],
+    'a +': ['Error: Not enough operands for operator +'],
+    'a $ b': ['Error: Invalid characters in expression'],
+}
+
+
+class TACProgramTest(unittest.TestCase):
+    def setUp(self):
+        self.program = TACProgram()
+        a = self.program.symbol('a')
+        b = self.program.symbol('b')
+        t0 = self.program.temp()
+        t1 = self.program.temp()
+        self.program.append('ADD', t0, a, b)
+        self.program.append('NOT', t1, t0)
+
+    def test_operand_encoding(self):
+        self.assertEqual(self.program.symbol('a'), 0)
+        self.assertEqual(self.program.symbol('b'), 1)
+        self.assertEqual(self.program.symbols, ['a', 'b'])
+        self.assertEqual(list(self.program.dest), [-2, -3])
+        self.assertEqual(list(self.program.src2), [1, NO_OPERAND])
+        self.assertEqual(list(self.program.opcode), [OPCODES.index('ADD'), OPCODES.index('NOT')])
+        self.assertIsNone(self.program.name(NO_OPERAND))
+
+    def test_render(self):
+        self.assertEqual(list(self.program), ['t0 = a ADD b', 't1 = NOT t0'])
+        self.assertEqual(self.program.instruction(1), ('t1', 'NOT', 't0', None))
+
+    def test_indexing(self):
+        self.assertEqual(len(self.program), 2)
+        self.assertEqual(self.program[-1], 't1 = NOT t0')
+        self.assertEqual(self.program[-2], 't0 = a ADD b')
+        with self.assertRaises(IndexError):
+            self.program[2]
+        with self.assertRaises(IndexError):
+            self.program[-3]
+
+    def test_columns_are_read_only_views(self):
+        columns = self.program.columns()
+        self.assertEqual(set(columns), {'opcode', 'dest', 'src1', 'src2'})
+        for name, view in columns.items():
+            self.assertTrue(view.readonly)
+            self.assertEqual(view.tolist(), list(getattr(self.program, name)))
+            with self.assertRaises(TypeError):
+                view[0] = 0
+
+        # A view shares the array's buffer, so the array cannot be resized
+        # while it is alive
+        with self.assertRaises(BufferError):
+            self.program.dest.append(0)
+
+
+class GeneratedProgramTest(unittest.TestCase):
+    def test_matches_string_generator(self):
+        generator = CodeGenerator()
+        for expression, expected in EXPECTED_CODE.items():
+            with self.subTest(expression=expression):
+                self.assertEqual(generator.generate_three_address_code(expression), expected)
+
+    def test_program_errors_raise(self):
+        with self.assertRaises(ValueError):
+            CodeGenerator().generate_three_address_program('(a')
+
+
+if __name__ == '__main__':
+    unittest.main()